@@ -3,16 +3,62 @@
 from __future__ import annotations
 
 import logging
+import math
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from itertools import islice
+from typing import ClassVar, Dict, List, Optional
 
 import carla
 
 from ..utils import clamp
 
-
-@dataclass
+# Re-query the world's vehicle/walker lists at least this often (frames);
+# a change in the snapshot's actor ids also forces a refresh.
+_ACTOR_REFRESH_FRAMES = 30
+# Reuse a vehicle's cut-in waypoint lookup for this many frames while it
+# stays within the looked-up lane and has moved less than this distance (m)
+# along it.
+_WAYPOINT_CACHE_FRAMES = 5
+_WAYPOINT_CACHE_MOVE_M = 2.0
+# Scenario roles that _detect_cut_in focuses on when present
+_CUT_IN_TARGET_ROLES = frozenset({"cut_in_vehicle", "merge_vehicle"})
+# Reuse a junction lookahead result while ego stays within this distance (m)
+# along the same road/lane.
+_JUNCTION_CACHE_MOVE_M = 0.5
+
+
+@dataclass(slots=True)
 class EventExtractor:
+    # Decision/reason text per event type
+    _EVENT_MAPPING: ClassVar[Dict[str, tuple[str, str]]] = {
+        "lane_change_left": ("Change lane left", "Need to adjust position"),
+        "lane_change_right": ("Change lane right", "Need to adjust position"),
+        "brake_hard": ("Brake hard", "Obstacle or conflict ahead"),
+        "slow_down": ("Slow down", "Traffic condition requires caution"),
+        "stop_for_red_light": ("Stop", "Red light ahead"),
+        "yield_to_emergency": ("Yield", "Emergency vehicle approaching"),
+        "avoid_pedestrian": ("Brake", "Pedestrian crossing ahead"),
+        "vehicle_cut_in": ("Caution", "Vehicle merging into lane"),
+        "yield_left_turn": ("Yield", "Oncoming traffic at intersection"),
+    }
+    # Cooldown seconds per event type; types not listed use the default cooldown
+    _COOLDOWNS: ClassVar[Dict[str, float]] = {
+        # Scenario-specific events should be rare (typically 1 per scenario)
+        "vehicle_cut_in": 8.0,
+        "avoid_pedestrian": 8.0,
+        "yield_to_emergency": 8.0,
+        "yield_left_turn": 8.0,
+        # Traffic light should only emit once per stop
+        "stop_for_red_light": 10.0,
+        # Generic braking/slowing should have moderate cooldown
+        "brake_hard": 4.0,
+        "slow_down": 4.0,
+        # Lane changes are discrete events
+        "lane_change_left": 3.0,
+        "lane_change_right": 3.0,
+    }
+
     world: carla.World
     ego_vehicle: carla.Vehicle
     map_obj: carla.Map
@@ -22,18 +68,51 @@ class EventExtractor:
     min_event_time_s: float = 0.0
     enabled_event_types: Optional[set[str]] = None
     single_event_types: set[str] = field(default_factory=set)
+    # Run the NPC detectors (cut-in, pedestrian, emergency) every N frames;
+    # ego lane/steer/brake/light checks always run every frame.
+    npc_detection_stride: int = 1
 
     _prev_speed: float = 0.0
     _prev_lane_id: Optional[int] = None
     _prev_road_id: Optional[int] = None
     _last_event_time: Dict[str, float] = field(default_factory=dict)
-    _events: List[dict] = field(default_factory=list)
+    _raw_events: List[tuple[float, str]] = field(default_factory=list)
     _prev_steer: float = 0.0
     _lane_change_pending: bool = False
     # Track vehicles in ego lane for cut-in detection
     _prev_vehicles_in_lane: set = field(default_factory=set)
     # Track vehicle distances for sudden approach detection
     _prev_vehicle_distances: dict = field(default_factory=dict)
+    # Emergency vehicle id -> recent distances to ego, for approach detection
+    _emergency_dist_history: Dict[int, deque] = field(default_factory=dict)
+    # One-shot / periodic debug logging state
+    _current_t: float = 0.0
+    _ped_post_trigger_logged: bool = False
+    _emergency_logged: bool = False
+    _no_emergency_logged: bool = False
+    _walker_logged: bool = False
+    _last_walker_track_t: float = 0.0
+    # Current tick's world snapshot and the actor positions (x, y, z) read from it
+    _snapshot: Optional[carla.WorldSnapshot] = None
+    _positions: Dict[int, tuple[float, float, float]] = field(default_factory=dict)
+    # (actor, role_name) lists cached across ticks, ego excluded; see _refresh_actor_cache
+    _vehicles_cache: List[tuple[carla.Actor, str]] = field(default_factory=list)
+    _walkers_cache: List[tuple[carla.Actor, str]] = field(default_factory=list)
+    _cache_frame: Optional[int] = None
+    # actor id -> role_name; role names are fixed at spawn so they outlive cache refreshes
+    _role_names: Dict[int, str] = field(default_factory=dict)
+    # actor id -> (frame, center_x, center_y, forward_x, forward_y, half lane width, waypoint)
+    # from the last get_waypoint lookup in _detect_cut_in
+    _wp_cache: Dict[int, tuple[int, float, float, float, float, float, carla.Waypoint]] = field(
+        default_factory=dict
+    )
+    # Actor ids seen at the last refresh; a mismatch with the snapshot forces a refresh
+    _actor_ids: frozenset[int] = frozenset()
+    # Role-based subsets of the vehicle cache, rebuilt with it
+    _emergency_role_vehicles: List[carla.Actor] = field(default_factory=list)
+    _cut_in_target_present: bool = False
+    # (road_id, lane_id, distance) -> (s, approaching) from the last junction lookahead
+    _junction_cache: Dict[tuple[int, int, float], tuple[float, bool]] = field(default_factory=dict)
 
     def tick(self, snapshot: carla.WorldSnapshot, frame_index: int) -> None:
         if self.fps > 0:
@@ -41,33 +120,40 @@ class EventExtractor:
         else:
             t = float(snapshot.timestamp.elapsed_seconds)
         self._current_t = t  # Store for logging in helper methods
+        self._snapshot = snapshot
+        self._positions = self._snapshot_actor_positions(snapshot)
+        self._refresh_actor_cache(frame_index)
         dt = float(snapshot.timestamp.delta_seconds or 1.0 / max(self.fps, 1))
 
         velocity = self.ego_vehicle.get_velocity()
-        speed = (velocity.x**2 + velocity.y**2 + velocity.z**2) ** 0.5
+        speed = math.sqrt(velocity.x * velocity.x + velocity.y * velocity.y + velocity.z * velocity.z)
         accel = (speed - self._prev_speed) / dt
 
         control = self.ego_vehicle.get_control()
+        ego_x, ego_y, ego_z = self._actor_position(self.ego_vehicle)
         waypoint = self.map_obj.get_waypoint(
-            self.ego_vehicle.get_location(), project_to_road=True, lane_type=carla.LaneType.Driving
+            carla.Location(x=ego_x, y=ego_y, z=ego_z),
+            project_to_road=True,
+            lane_type=carla.LaneType.Driving,
         )
         lane_id = waypoint.lane_id if waypoint else None
         road_id = waypoint.road_id if waypoint else None
 
         # --- NPC Event Detection (scenario-driven events) ---
+        detect_npcs = frame_index % max(self.npc_detection_stride, 1) == 0
 
         # 1. Cut-in / Merge detection: another vehicle enters ego's lane ahead
-        cut_in_vehicle = self._detect_cut_in(waypoint)
+        cut_in_vehicle = self._detect_cut_in(waypoint, frame_index) if detect_npcs else None
         if cut_in_vehicle:
             self._emit(t, "vehicle_cut_in")
 
         # 2. Pedestrian crossing detection: pedestrian near ego
         # Detect any walker within 25m - close pedestrian is a hazard
-        pedestrian_nearby = self._nearest_walker(25.0)
+        pedestrian_nearby = self._nearest_walker(25.0) if detect_npcs else None
         if pedestrian_nearby:
-            ped_dist = pedestrian_nearby.get_location().distance(self.ego_vehicle.get_location())
+            ped_dist = self._distance_to_ego(pedestrian_nearby)
             # Log when pedestrian first gets close (after potential relocation)
-            if t > 35.0 and not hasattr(self, "_ped_post_trigger_logged"):
+            if t > 35.0 and not self._ped_post_trigger_logged:
                 logging.info("Pedestrian post-trigger: dist=%.1fm speed=%.1f t=%.1f",
                            ped_dist, speed, t)
                 self._ped_post_trigger_logged = True
@@ -77,21 +163,21 @@ class EventExtractor:
 
         # 3. Emergency vehicle approaching - detect when nearby and ego is responding
         # Check for any emergency vehicle (ambulance, firetruck, police) within range
-        emergency = self._nearest_emergency_vehicle(100.0)
+        emergency = self._nearest_emergency_vehicle(100.0) if detect_npcs else None
         if emergency:
-            emergency_dist = emergency.get_location().distance(self.ego_vehicle.get_location())
+            emergency_dist = self._distance_to_ego(emergency)
             # Track distance history to detect approach (over multiple ticks)
-            if not hasattr(self, "_emergency_dist_history"):
-                self._emergency_dist_history = {}
-            history = self._emergency_dist_history.setdefault(emergency.id, [])
+            history = self._emergency_dist_history.get(emergency.id)
+            if history is None:
+                # Keep last 20 samples (~2s at 10fps)
+                history = self._emergency_dist_history[emergency.id] = deque(maxlen=20)
             history.append(emergency_dist)
-            if len(history) > 20:  # Keep last 20 samples (~2s at 10fps)
-                history.pop(0)
             # Approaching = distance decreased over recent history
             is_approaching = False
             if len(history) >= 5:
                 # Compare current dist to average of older samples
-                old_avg = sum(history[:len(history)//2]) / (len(history)//2)
+                half = len(history) // 2
+                old_avg = sum(islice(history, half)) / half
                 is_approaching = emergency_dist < old_avg - 1.0  # Getting closer by 1m+
             # Trigger when emergency vehicle is approaching and close
             # Note: CARLA autopilot doesn't automatically yield to emergency vehicles,
@@ -123,15 +209,19 @@ class EventExtractor:
         elif control.brake > 0.3 or accel < -1.5:
             self._emit(t, "slow_down")
 
-        # Traffic light
-        if self.ego_vehicle.is_at_traffic_light():
+        # Traffic light (only stopped ego can emit, so skip the light queries while moving)
+        if speed < 0.5 and self.ego_vehicle.is_at_traffic_light():
             traffic_light = self.ego_vehicle.get_traffic_light()
-            if traffic_light and traffic_light.state == carla.TrafficLightState.Red and speed < 0.5:
+            if traffic_light and traffic_light.state == carla.TrafficLightState.Red:
                 self._emit(t, "stop_for_red_light")
 
         # Unprotected left turn detection (junction or approaching junction)
-        is_near_junction = waypoint and (waypoint.is_junction or self._is_approaching_junction(waypoint))
-        if is_near_junction and control.steer < -0.10:  # Turning left
+        # Check steering first so the junction lookahead only runs while turning left
+        is_turning_left = control.steer < -0.10
+        is_near_junction = is_turning_left and waypoint and (
+            waypoint.is_junction or self._is_approaching_junction(waypoint)
+        )
+        if is_near_junction:
             # Yield if braking or slow while turning left at junction
             if control.brake > 0.05 or speed < 8.0:
                 self._emit(t, "yield_left_turn")
@@ -142,7 +232,29 @@ class EventExtractor:
         self._prev_steer = control.steer
 
     def finalize(self) -> List[dict]:
-        return list(self._events)
+        events: List[dict] = []
+        for event_index, (t_event, event_type) in enumerate(self._raw_events):
+            decision, reason = self._format_event(event_type)
+            t_voice_start = round(
+                clamp(t_event - self.voice_lead_time_s, 0.0, t_event), 3
+            )
+            t_robot_precue = round(
+                clamp(t_voice_start - self.robot_precue_lead_s, 0.0, t_voice_start), 3
+            )
+            events.append(
+                {
+                    "t": t_event,
+                    "t_event": t_event,
+                    "t_voice_start": t_voice_start,
+                    "t_robot_precue": t_robot_precue,
+                    "type": event_type,
+                    "decision_text": decision,
+                    "reason_text": reason,
+                    "robot_precue_t": t_robot_precue,
+                    "audio_id": f"{event_type}_{event_index:02d}",
+                }
+            )
+        return events
 
     def _emit(self, t: float, event_type: str) -> None:
         if self.enabled_event_types is not None and event_type not in self.enabled_event_types:
@@ -153,27 +265,7 @@ class EventExtractor:
             return
         if not self._should_emit(t, event_type):
             return
-        decision, reason = self._format_event(event_type)
-        event_index = len(self._events)
-        t_event = round(t, 3)
-        t_voice_start = round(
-            clamp(t_event - self.voice_lead_time_s, 0.0, t_event), 3
-        )
-        t_robot_precue = round(
-            clamp(t_voice_start - self.robot_precue_lead_s, 0.0, t_voice_start), 3
-        )
-        payload = {
-            "t": t_event,
-            "t_event": t_event,
-            "t_voice_start": t_voice_start,
-            "t_robot_precue": t_robot_precue,
-            "type": event_type,
-            "decision_text": decision,
-            "reason_text": reason,
-            "robot_precue_t": t_robot_precue,
-            "audio_id": f"{event_type}_{event_index:02d}",
-        }
-        self._events.append(payload)
+        self._raw_events.append((round(t, 3), event_type))
         self._last_event_time[event_type] = t
 
     def _should_emit(self, t: float, event_type: str, cooldown: float = 2.0) -> bool:
@@ -184,168 +276,251 @@ class EventExtractor:
         - Traffic light events: 10s cooldown (one per approach)
         - Generic braking events: 4s cooldown
         """
-        # Scenario-specific events should be rare (typically 1 per scenario)
-        scenario_events = {"vehicle_cut_in", "avoid_pedestrian", "yield_to_emergency", "yield_left_turn"}
-        if event_type in scenario_events:
-            cooldown = 8.0
-        # Traffic light should only emit once per stop
-        elif event_type == "stop_for_red_light":
-            cooldown = 10.0
-        # Generic braking/slowing should have moderate cooldown
-        elif event_type in {"brake_hard", "slow_down"}:
-            cooldown = 4.0
-        # Lane changes are discrete events
-        elif event_type in {"lane_change_left", "lane_change_right"}:
-            cooldown = 3.0
-
+        cooldown = self._COOLDOWNS.get(event_type, cooldown)
         last_t = self._last_event_time.get(event_type)
         if last_t is None:
             return True
         return (t - last_t) >= cooldown
 
     def _format_event(self, event_type: str) -> tuple[str, str]:
-        mapping = {
-            "lane_change_left": ("Change lane left", "Need to adjust position"),
-            "lane_change_right": ("Change lane right", "Need to adjust position"),
-            "brake_hard": ("Brake hard", "Obstacle or conflict ahead"),
-            "slow_down": ("Slow down", "Traffic condition requires caution"),
-            "stop_for_red_light": ("Stop", "Red light ahead"),
-            "yield_to_emergency": ("Yield", "Emergency vehicle approaching"),
-            "avoid_pedestrian": ("Brake", "Pedestrian crossing ahead"),
-            "vehicle_cut_in": ("Caution", "Vehicle merging into lane"),
-            "yield_left_turn": ("Yield", "Oncoming traffic at intersection"),
+        return self._EVENT_MAPPING.get(event_type, (event_type, ""))
+
+    @staticmethod
+    def _snapshot_actor_positions(
+        snapshot: carla.WorldSnapshot,
+    ) -> Dict[int, tuple[float, float, float]]:
+        """Collect every actor's location from the snapshot in one pass."""
+        positions = {}
+        for actor_snapshot in snapshot:
+            loc = actor_snapshot.get_transform().location
+            positions[actor_snapshot.id] = (loc.x, loc.y, loc.z)
+        return positions
+
+    def _refresh_actor_cache(self, frame_index: int) -> None:
+        """Re-fetch vehicle/walker lists when stale or when actors were added/removed."""
+        if (
+            self._cache_frame is not None
+            and frame_index - self._cache_frame < _ACTOR_REFRESH_FRAMES
+            and self._positions.keys() == self._actor_ids
+        ):
+            return
+        # Single pass partitioned by type_id prefix instead of two fnmatch filters
+        ego_id = self.ego_vehicle.id
+        previous_roles = self._role_names
+        role_names: Dict[int, str] = {}
+        vehicles: List[tuple[carla.Actor, str]] = []
+        walkers: List[tuple[carla.Actor, str]] = []
+        for actor in self.world.get_actors():
+            type_id = actor.type_id
+            if type_id.startswith("vehicle."):
+                if actor.id == ego_id:
+                    continue
+                bucket = vehicles
+            elif type_id.startswith("walker.pedestrian."):
+                bucket = walkers
+            else:
+                continue
+            actor_id = actor.id
+            role_name = previous_roles.get(actor_id)
+            if role_name is None:
+                role_name = actor.attributes.get("role_name", "")
+            role_names[actor_id] = role_name
+            bucket.append((actor, role_name))
+        self._role_names = role_names
+        self._vehicles_cache = vehicles
+        self._walkers_cache = walkers
+        self._emergency_role_vehicles = [
+            actor for actor, role_name in vehicles if role_name == "emergency"
+        ]
+        self._cut_in_target_present = any(
+            role_name in _CUT_IN_TARGET_ROLES for _, role_name in vehicles
+        )
+        self._actor_ids = frozenset(self._positions)
+        self._cache_frame = frame_index
+        self._wp_cache = {
+            actor_id: cached for actor_id, cached in self._wp_cache.items()
+            if actor_id in self._actor_ids
         }
-        return mapping.get(event_type, (event_type, ""))
+
+    def _actor_waypoint(
+        self, actor_id: int, x: float, y: float, z: float, frame_index: int
+    ) -> Optional[carla.Waypoint]:
+        """Return the actor's driving-lane waypoint.
+
+        Reuses a recent lookup while the actor is still inside that waypoint's
+        lane (lateral offset from its centerline below half the lane width) and
+        close to it along the lane; a vehicle changing lanes is re-queried as
+        soon as it leaves the cached lane.
+        """
+        cached = self._wp_cache.get(actor_id)
+        if cached is not None:
+            cached_frame, cx, cy, fx, fy, half_width, cached_waypoint = cached
+            dx = x - cx
+            dy = y - cy
+            if (
+                frame_index - cached_frame < _WAYPOINT_CACHE_FRAMES
+                and abs(dx * fx + dy * fy) < _WAYPOINT_CACHE_MOVE_M
+                and abs(dy * fx - dx * fy) < half_width
+            ):
+                return cached_waypoint
+        waypoint = self.map_obj.get_waypoint(
+            carla.Location(x=x, y=y, z=z), project_to_road=True, lane_type=carla.LaneType.Driving
+        )
+        self._wp_cache.pop(actor_id, None)
+        if waypoint is not None:
+            center = waypoint.transform.location
+            fwd = waypoint.transform.get_forward_vector()
+            norm = math.hypot(fwd.x, fwd.y)
+            if norm > 1e-6:
+                self._wp_cache[actor_id] = (
+                    frame_index, center.x, center.y, fwd.x / norm, fwd.y / norm,
+                    0.5 * waypoint.lane_width, waypoint,
+                )
+        return waypoint
+
+    def _actor_position(self, actor: carla.Actor) -> tuple[float, float, float]:
+        """Return actor (x, y, z) from the tick snapshot, querying only on a miss."""
+        position = self._positions.get(actor.id)
+        if position is None:
+            loc = actor.get_location()
+            position = (loc.x, loc.y, loc.z)
+        return position
+
+    def _actor_forward(self, actor: carla.Actor) -> carla.Vector3D:
+        """Return actor forward vector from the tick snapshot, querying only on a miss."""
+        actor_snapshot = self._snapshot.find(actor.id) if self._snapshot is not None else None
+        if actor_snapshot is None:
+            return actor.get_transform().get_forward_vector()
+        return actor_snapshot.get_transform().get_forward_vector()
+
+    def _distance_to_ego(self, actor: carla.Actor) -> float:
+        """Euclidean distance from ego using the tick snapshot positions."""
+        x, y, z = self._actor_position(actor)
+        ego_x, ego_y, ego_z = self._actor_position(self.ego_vehicle)
+        dx, dy, dz = x - ego_x, y - ego_y, z - ego_z
+        return math.sqrt(dx * dx + dy * dy + dz * dz)
 
     def _nearest_actor_with_role(self, role_name: str, radius: float) -> Optional[carla.Actor]:
         """Find nearest vehicle with a specific role_name or type_id pattern."""
-        ego_loc = self.ego_vehicle.get_location()
-        vehicles = self.world.get_actors().filter("vehicle.*")
+        ego_x, ego_y, ego_z = self._actor_position(self.ego_vehicle)
         closest = None
-        min_dist = radius
-        for actor in vehicles:
-            if actor.id == self.ego_vehicle.id:
-                continue
-            # Check role_name attribute
-            actor_role = actor.attributes.get("role_name", "")
+        min_dist_sq = radius * radius
+        for actor, actor_role in self._vehicles_cache:
             # For emergency vehicles, also check type_id
             is_emergency = (role_name == "emergency" and
                            ("ambulance" in actor.type_id or "firetruck" in actor.type_id or
                             "police" in actor.type_id or actor_role == "emergency"))
             if actor_role == role_name or is_emergency:
-                dist = actor.get_location().distance(ego_loc)
-                if dist < min_dist:
-                    min_dist = dist
+                x, y, z = self._actor_position(actor)
+                dx, dy, dz = x - ego_x, y - ego_y, z - ego_z
+                dist_sq = dx * dx + dy * dy + dz * dz
+                if dist_sq < min_dist_sq:
+                    min_dist_sq = dist_sq
                     closest = actor
         return closest
 
     def _nearest_emergency_vehicle(self, radius: float) -> Optional[carla.Actor]:
         """Find nearest emergency vehicle by role_name to avoid background false positives."""
-        ego_loc = self.ego_vehicle.get_location()
-        vehicles = self.world.get_actors().filter("vehicle.*")
+        ego_x, ego_y, ego_z = self._actor_position(self.ego_vehicle)
         closest = None
-        min_dist = radius
+        min_dist_sq = radius * radius
         emergency_found = []
-        for actor in vehicles:
-            if actor.id == self.ego_vehicle.id:
-                continue
-            role_name = actor.attributes.get("role_name", "")
-            if role_name != "emergency":
-                continue
-            dist = actor.get_location().distance(ego_loc)
-            emergency_found.append((actor.type_id, dist))
-            if dist < min_dist:
-                min_dist = dist
+        for actor in self._emergency_role_vehicles:
+            x, y, z = self._actor_position(actor)
+            dx, dy, dz = x - ego_x, y - ego_y, z - ego_z
+            dist_sq = dx * dx + dy * dy + dz * dz
+            emergency_found.append((actor.type_id, math.sqrt(dist_sq)))
+            if dist_sq < min_dist_sq:
+                min_dist_sq = dist_sq
                 closest = actor
-        if emergency_found and not hasattr(self, "_emergency_logged"):
+        if emergency_found and not self._emergency_logged:
             logging.info("Emergency vehicles found: %s", emergency_found)
             self._emergency_logged = True
-        elif not emergency_found and not hasattr(self, "_no_emergency_logged"):
-            all_roles = [v.attributes.get("role_name", "") for v in vehicles if v.id != self.ego_vehicle.id][:5]
+        elif not emergency_found and not self._no_emergency_logged:
+            all_roles = [role for _, role in self._vehicles_cache[:5]]
             logging.warning("No emergency vehicles found. Sample vehicle roles: %s", all_roles)
             self._no_emergency_logged = True
         return closest
 
     def _nearest_walker(self, radius: float) -> Optional[carla.Actor]:
-        ego_loc = self.ego_vehicle.get_location()
-        walkers = self.world.get_actors().filter("walker.pedestrian.*")
+        ego_x, ego_y, ego_z = self._actor_position(self.ego_vehicle)
         closest = None
-        min_dist = radius
+        min_dist_sq = radius * radius
+        # Walker list is only needed for the debug logs below
+        log_walkers = logging.getLogger().isEnabledFor(logging.INFO)
         walker_found = []
-        for actor in walkers:
+        for actor, _ in self._walkers_cache:
             try:
-                actor_loc = actor.get_location()
-                dist = actor_loc.distance(ego_loc)
-                walker_found.append((actor.type_id, dist, actor_loc.x, actor_loc.y))
+                x, y, z = self._actor_position(actor)
             except RuntimeError:
                 continue  # Actor may be destroyed
-            if dist < min_dist:
-                min_dist = dist
+            dx, dy, dz = x - ego_x, y - ego_y, z - ego_z
+            dist_sq = dx * dx + dy * dy + dz * dz
+            if log_walkers:
+                walker_found.append((actor.type_id, math.sqrt(dist_sq), x, y))
+            if dist_sq < min_dist_sq:
+                min_dist_sq = dist_sq
                 closest = actor
-        if walker_found and not hasattr(self, "_walker_logged"):
-            logging.info("Walkers found: %s (closest: %.1fm)", walker_found, min_dist if closest else -1)
+        if walker_found and not self._walker_logged:
+            logging.info("Walkers found: %s (closest: %.1fm)", walker_found,
+                         math.sqrt(min_dist_sq) if closest else -1)
             self._walker_logged = True
         # Log walker position periodically between t=37-45s to debug relocation
-        t_now = getattr(self, "_current_t", 0)
+        t_now = self._current_t
         if t_now > 37.0 and t_now < 45.0:
-            last_log = getattr(self, "_last_walker_track_t", 0)
+            last_log = self._last_walker_track_t
             if (t_now - last_log) >= 1.0 and walker_found:
                 logging.info("Walker track t=%.1f: dist=%.1f pos=(%.1f,%.1f)",
                            t_now, walker_found[0][1], walker_found[0][2], walker_found[0][3])
                 self._last_walker_track_t = t_now
         return closest
 
-    def _pedestrian_in_front(self, radius: float) -> Optional[carla.Actor]:
+    def _pedestrian_in_front(
+        self, radius: float, min_dot_front: float = 0.2
+    ) -> Optional[carla.Actor]:
         """Find nearest pedestrian that is in front of the ego vehicle.
 
-        Checks if pedestrian is within radius AND in the forward hemisphere of ego.
+        Checks if pedestrian is within radius AND in the forward hemisphere of ego
+        (cosine to ego heading above min_dot_front).
         This is more specific than _nearest_walker which finds any walker in radius.
         """
-        ego_loc = self.ego_vehicle.get_location()
-        ego_fwd = self.ego_vehicle.get_transform().get_forward_vector()
-        walkers = self.world.get_actors().filter("walker.pedestrian.*")
+        ego_x, ego_y, ego_z = self._actor_position(self.ego_vehicle)
+        ego_fwd = self._actor_forward(self.ego_vehicle)
         closest = None
-        min_dist = radius
-        for walker in walkers:
-            walker_loc = walker.get_location()
-            dist = walker_loc.distance(ego_loc)
-            if dist >= min_dist:
+        min_dist_sq = radius * radius
+        for walker, _ in self._walkers_cache:
+            x, y, z = self._actor_position(walker)
+            dx, dy, dz = x - ego_x, y - ego_y, z - ego_z
+            dist_sq = dx * dx + dy * dy + dz * dz
+            if dist_sq >= min_dist_sq:
                 continue
             # Check if walker is in front of ego
-            dx = walker_loc.x - ego_loc.x
-            dy = walker_loc.y - ego_loc.y
-            mag = (dx * dx + dy * dy) ** 0.5
+            mag = math.hypot(dx, dy)
             if mag < 1.0:
                 continue
             # Dot product: positive means in front
             dot_front = (ego_fwd.x * dx + ego_fwd.y * dy) / mag
-            if dot_front > 0.2:  # In front hemisphere
-                min_dist = dist
+            if dot_front > min_dot_front:  # In front hemisphere
+                min_dist_sq = dist_sq
                 closest = walker
         return closest
 
     def _nearest_oncoming_vehicle(self, radius: float) -> Optional[carla.Actor]:
         """Find nearest vehicle that appears to be oncoming (opposite direction)."""
-        ego_loc = self.ego_vehicle.get_location()
-        ego_fwd = self.ego_vehicle.get_transform().get_forward_vector()
-        vehicles = self.world.get_actors().filter("vehicle.*")
+        ego_x, ego_y, ego_z = self._actor_position(self.ego_vehicle)
+        ego_fwd = self._actor_forward(self.ego_vehicle)
         closest = None
-        min_dist = radius
-        for actor in vehicles:
-            if actor.id == self.ego_vehicle.id:
-                continue
-            actor_loc = actor.get_location()
-            dist = actor_loc.distance(ego_loc)
-            if dist >= min_dist:
+        min_dist_sq = radius * radius
+        for actor, _ in self._vehicles_cache:
+            x, y, z = self._actor_position(actor)
+            dx, dy, dz = x - ego_x, y - ego_y, z - ego_z
+            dist_sq = dx * dx + dy * dy + dz * dz
+            if dist_sq >= min_dist_sq:
                 continue
             # Check if vehicle is roughly in front and heading toward ego
-            to_actor = carla.Vector3D(
-                actor_loc.x - ego_loc.x,
-                actor_loc.y - ego_loc.y,
-                0.0
-            )
+            to_actor = carla.Vector3D(dx, dy, 0.0)
             # Normalize
-            mag = (to_actor.x**2 + to_actor.y**2) ** 0.5
+            mag = math.hypot(to_actor.x, to_actor.y)
             if mag < 1.0:
                 continue
             to_actor.x /= mag
@@ -355,15 +530,17 @@ class EventExtractor:
             if dot_front < 0.3:  # Not in front
                 continue
             # Check if actor is heading toward ego (opposite direction)
-            actor_fwd = actor.get_transform().get_forward_vector()
+            actor_fwd = self._actor_forward(actor)
             dot_dir = ego_fwd.x * actor_fwd.x + ego_fwd.y * actor_fwd.y
             if dot_dir > -0.5:  # Not oncoming
                 continue
-            min_dist = dist
+            min_dist_sq = dist_sq
             closest = actor
         return closest
 
-    def _detect_cut_in(self, ego_waypoint: Optional[carla.Waypoint]) -> Optional[carla.Actor]:
+    def _detect_cut_in(
+        self, ego_waypoint: Optional[carla.Waypoint], frame_index: int
+    ) -> Optional[carla.Actor]:
         """Detect if a vehicle has just cut into ego's lane ahead.
 
         Detection methods:
@@ -373,57 +550,41 @@ class EventExtractor:
         if ego_waypoint is None:
             return None
 
-        ego_loc = self.ego_vehicle.get_location()
-        ego_fwd = self.ego_vehicle.get_transform().get_forward_vector()
+        ego_x, ego_y, ego_z = self._actor_position(self.ego_vehicle)
+        ego_fwd = self._actor_forward(self.ego_vehicle)
         ego_lane_id = ego_waypoint.lane_id
         ego_road_id = ego_waypoint.road_id
 
-        vehicles = self.world.get_actors().filter("vehicle.*")
-        target_roles = {"cut_in_vehicle", "merge_vehicle"}
-        target_present = False
-        for actor in vehicles:
-            if actor.id == self.ego_vehicle.id:
-                continue
-            role_name = actor.attributes.get("role_name", "")
-            if role_name in target_roles:
-                target_present = True
-                break
+        target_present = self._cut_in_target_present
         current_vehicles_in_lane = set()
         current_distances = {}
         detected_cut_in = None
 
-        for actor in vehicles:
-            if actor.id == self.ego_vehicle.id:
+        for actor, role_name in self._vehicles_cache:
+            if target_present and role_name not in _CUT_IN_TARGET_ROLES:
                 continue
-            if target_present:
-                role_name = actor.attributes.get("role_name", "")
-                if role_name not in target_roles:
-                    continue
 
-            actor_loc = actor.get_location()
-            dist = actor_loc.distance(ego_loc)
+            x, y, z = self._actor_position(actor)
+            dx, dy, dz = x - ego_x, y - ego_y, z - ego_z
+            dist_sq = dx * dx + dy * dy + dz * dz
 
             # Only check vehicles within 60m
-            if dist > 60.0:
+            if dist_sq > 60.0 * 60.0:
                 continue
 
             # Check if vehicle is in front
-            to_actor = carla.Vector3D(actor_loc.x - ego_loc.x, actor_loc.y - ego_loc.y, 0.0)
-            mag = (to_actor.x**2 + to_actor.y**2) ** 0.5
+            mag = math.hypot(dx, dy)
             if mag < 1.0:
                 continue
-            to_actor.x /= mag
-            to_actor.y /= mag
-            dot_front = ego_fwd.x * to_actor.x + ego_fwd.y * to_actor.y
+            dot_front = (ego_fwd.x * dx + ego_fwd.y * dy) / mag
             if dot_front < 0.3:  # Not in front (relaxed)
                 continue
 
+            dist = math.sqrt(dist_sq)
             current_distances[actor.id] = dist
 
             # Check if vehicle is in ego's lane
-            actor_waypoint = self.map_obj.get_waypoint(
-                actor_loc, project_to_road=True, lane_type=carla.LaneType.Driving
-            )
+            actor_waypoint = self._actor_waypoint(actor.id, x, y, z, frame_index)
             if actor_waypoint is None:
                 continue
 
@@ -455,49 +616,16 @@ class EventExtractor:
 
         Returns closest walker in front of ego within 20m.
         """
-        ego_loc = self.ego_vehicle.get_location()
-        ego_fwd = self.ego_vehicle.get_transform().get_forward_vector()
-
-        # Get all walkers - use filter for pedestrian actors
-        walkers = self.world.get_actors().filter("walker.pedestrian.*")
-
-        closest_walker = None
-        min_dist = 20.0
-
-        for walker in walkers:
-            walker_loc = walker.get_location()
-            dist = walker_loc.distance(ego_loc)
-
-            if dist >= min_dist:
-                continue
-
-            # Vector from ego to walker
-            dx = walker_loc.x - ego_loc.x
-            dy = walker_loc.y - ego_loc.y
-            mag = (dx * dx + dy * dy) ** 0.5
-            if mag < 1.0:
-                continue
-
-            # Check if walker is in front
-            dot_front = (ego_fwd.x * dx + ego_fwd.y * dy) / mag
-            if dot_front > 0.0:  # In front hemisphere
-                min_dist = dist
-                closest_walker = walker
-
-        return closest_walker
+        return self._pedestrian_in_front(20.0, min_dot_front=0.0)
 
     def _is_vehicle_behind(self, vehicle: carla.Actor) -> bool:
         """Check if a vehicle is behind the ego vehicle."""
-        ego_loc = self.ego_vehicle.get_location()
-        ego_fwd = self.ego_vehicle.get_transform().get_forward_vector()
-        vehicle_loc = vehicle.get_location()
-
-        to_vehicle = carla.Vector3D(
-            vehicle_loc.x - ego_loc.x,
-            vehicle_loc.y - ego_loc.y,
-            0.0
-        )
-        mag = (to_vehicle.x**2 + to_vehicle.y**2) ** 0.5
+        ego_x, ego_y, _ = self._actor_position(self.ego_vehicle)
+        ego_fwd = self._actor_forward(self.ego_vehicle)
+        vehicle_x, vehicle_y, _ = self._actor_position(vehicle)
+
+        to_vehicle = carla.Vector3D(vehicle_x - ego_x, vehicle_y - ego_y, 0.0)
+        mag = math.hypot(to_vehicle.x, to_vehicle.y)
         if mag < 1.0:
             return False
         to_vehicle.x /= mag
@@ -511,15 +639,22 @@ class EventExtractor:
         """Check if ego is approaching a junction within specified distance."""
         if waypoint is None:
             return False
+        key = (waypoint.road_id, waypoint.lane_id, distance)
+        cached = self._junction_cache.get(key)
+        if cached is not None and abs(waypoint.s - cached[0]) < _JUNCTION_CACHE_MOVE_M:
+            return cached[1]
+        approaching = False
         current = waypoint
         traveled = 0.0
         step = 5.0
         while traveled < distance:
             next_wps = current.next(step)
             if not next_wps:
-                return False
+                break
             current = next_wps[0]
             traveled += step
             if current.is_junction:
-                return True
-        return False
+                approaching = True
+                break
+        self._junction_cache[key] = (waypoint.s, approaching)
+        return approaching
@@ -7,16 +7,32 @@ behavior is, focusing on comfort, predictability, and social driving norms.
 from __future__ import annotations
 
 import math
+from array import array
+from operator import mul, sub
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any
+from typing import ClassVar, Dict, List, Optional, Any, Sequence
 
 import carla
 
+# Re-query the vehicle list for lead detection at least this often (ticks)
+_VEHICLE_REFRESH_TICKS = 10
+# Reuse the last lane-center waypoint while ego stays within this distance (m)
+# of it along the lane and inside the lane's width.
+_LANE_WAYPOINT_REUSE_M = 1.0
 
-@dataclass
+
+@dataclass(slots=True)
 class NaturalnessMetrics:
     """Computed naturalness metrics for a driving episode."""
 
+    # Default category weights for compute_naturalness_score
+    _DEFAULT_WEIGHTS: ClassVar[Dict[str, float]] = {
+        "comfort": 0.35,
+        "predictability": 0.25,
+        "safety": 0.25,
+        "efficiency": 0.15,
+    }
+
     # Safety metrics
     collision_count: int = 0
     min_ttc: float = float("inf")
@@ -90,12 +106,7 @@ class NaturalnessMetrics:
             weights: Optional weight dictionary for different metric categories
         """
         if weights is None:
-            weights = {
-                "comfort": 0.35,
-                "predictability": 0.25,
-                "safety": 0.25,
-                "efficiency": 0.15,
-            }
+            weights = self._DEFAULT_WEIGHTS
 
         # Comfort score (lower jerk/accel = higher score)
         jerk_penalty = min(1.0, (self.jerk_rms_longitudinal + self.jerk_rms_lateral) / 4.0)
@@ -129,30 +140,34 @@ class NaturalnessMetrics:
         return round(total, 2)
 
 
-@dataclass
+@dataclass(slots=True)
 class MetricsCollector:
     """Collects per-tick data for computing naturalness metrics."""
 
     fps: int = 20
     speed_limit_mps: float = 13.89  # 50 km/h default
-
-    # Internal state
-    _speeds: List[float] = field(default_factory=list)
-    _accels_long: List[float] = field(default_factory=list)
-    _accels_lat: List[float] = field(default_factory=list)
-    _jerks_long: List[float] = field(default_factory=list)
-    _jerks_lat: List[float] = field(default_factory=list)
-    _steers: List[float] = field(default_factory=list)
-    _steer_rates: List[float] = field(default_factory=list)
-    _lane_offsets: List[float] = field(default_factory=list)
-    _ttcs: List[float] = field(default_factory=list)
-    _headways: List[float] = field(default_factory=list)
+    # Run the lead-vehicle search (TTC / headway) every N ticks;
+    # speed, acceleration and jerk are always recorded every tick.
+    lead_subsample: int = 1
+
+    # Internal state (per-tick series stored as unboxed doubles)
+    _speeds: array = field(default_factory=lambda: array("d"))
+    _accels_long: array = field(default_factory=lambda: array("d"))
+    _accels_lat: array = field(default_factory=lambda: array("d"))
+    _jerks_long: array = field(default_factory=lambda: array("d"))
+    _jerks_lat: array = field(default_factory=lambda: array("d"))
+    _steers: array = field(default_factory=lambda: array("d"))
+    _steer_rates: array = field(default_factory=lambda: array("d"))
+    _lane_offsets: array = field(default_factory=lambda: array("d"))
+    _ttcs: array = field(default_factory=lambda: array("d"))
+    _headways: array = field(default_factory=lambda: array("d"))
 
     _prev_speed: float = 0.0
     _prev_accel_long: float = 0.0
     _prev_accel_lat: float = 0.0
     _prev_steer: float = 0.0
-    _prev_velocity: Optional[carla.Vector3D] = None
+    # Previous ego velocity as (vx, vy, vz)
+    _prev_velocity: Optional[tuple[float, float, float]] = None
 
     _collision_count: int = 0
     _hard_brake_count: int = 0
@@ -163,19 +178,45 @@ class MetricsCollector:
     _start_location: Optional[carla.Location] = None
     _end_location: Optional[carla.Location] = None
 
+    # Non-ego vehicles for lead detection, re-fetched every _VEHICLE_REFRESH_TICKS
+    # ticks or when the snapshot's actor ids change
+    _vehicle_cache: List[carla.Actor] = field(default_factory=list)
+    _vehicle_cache_tick: int = -1
+    # Actor ids seen at the last refresh; a mismatch with the snapshot forces a refresh
+    _vehicle_cache_actor_ids: frozenset[int] = frozenset()
+    # Last lane-center waypoint as (x, y, forward_x, forward_y, half lane width)
+    _lane_center: Optional[tuple[float, float, float, float, float]] = None
+    # Ticks per second (1 / dt), fixed at construction
+    _inv_dt: float = field(init=False, default=1.0)
+
+    def __post_init__(self) -> None:
+        self._inv_dt = float(max(1, self.fps))
+
     def tick(
         self,
         ego_vehicle: carla.Vehicle,
         world: carla.World,
         map_obj: carla.Map,
+        snapshot: Optional[carla.WorldSnapshot] = None,
     ) -> None:
-        """Record metrics for current tick."""
+        """Record metrics for current tick.
+
+        Actor states are read from ``snapshot`` (defaults to the world's latest
+        snapshot) so only the ego control is queried per tick.
+        """
         self._total_ticks += 1
-        dt = 1.0 / max(1, self.fps)
+        inv_dt = self._inv_dt
+        if snapshot is None:
+            snapshot = world.get_snapshot()
 
         # Get vehicle state
-        transform = ego_vehicle.get_transform()
-        velocity = ego_vehicle.get_velocity()
+        ego_snapshot = snapshot.find(ego_vehicle.id)
+        if ego_snapshot is not None:
+            transform = ego_snapshot.get_transform()
+            velocity = ego_snapshot.get_velocity()
+        else:
+            transform = ego_vehicle.get_transform()
+            velocity = ego_vehicle.get_velocity()
         control = ego_vehicle.get_control()
         location = transform.location
 
@@ -184,59 +225,50 @@ class MetricsCollector:
         self._end_location = location
 
         # Speed
-        speed = math.sqrt(velocity.x**2 + velocity.y**2 + velocity.z**2)
+        vx, vy, vz = velocity.x, velocity.y, velocity.z
+        speed = math.hypot(vx, vy, vz)
         self._speeds.append(speed)
 
-        # Longitudinal acceleration (along vehicle forward direction)
+        # Longitudinal / lateral acceleration (velocity change along forward / right)
         fwd = transform.get_forward_vector()
-        accel_long = 0.0
-        if self._prev_velocity is not None:
-            dv = carla.Vector3D(
-                velocity.x - self._prev_velocity.x,
-                velocity.y - self._prev_velocity.y,
-                velocity.z - self._prev_velocity.z,
-            )
-            accel_long = (dv.x * fwd.x + dv.y * fwd.y + dv.z * fwd.z) / dt
-        self._accels_long.append(accel_long)
-
-        # Lateral acceleration
         right = self._get_right_vector(transform)
+        accel_long = 0.0
         accel_lat = 0.0
         if self._prev_velocity is not None:
-            dv = carla.Vector3D(
-                velocity.x - self._prev_velocity.x,
-                velocity.y - self._prev_velocity.y,
-                velocity.z - self._prev_velocity.z,
-            )
-            accel_lat = (dv.x * right.x + dv.y * right.y + dv.z * right.z) / dt
+            pvx, pvy, pvz = self._prev_velocity
+            dvx = vx - pvx
+            dvy = vy - pvy
+            dvz = vz - pvz
+            accel_long = (dvx * fwd.x + dvy * fwd.y + dvz * fwd.z) * inv_dt
+            accel_lat = (dvx * right.x + dvy * right.y + dvz * right.z) * inv_dt
+        self._accels_long.append(accel_long)
         self._accels_lat.append(accel_lat)
 
         # Jerk (derivative of acceleration)
-        jerk_long = (accel_long - self._prev_accel_long) / dt
-        jerk_lat = (accel_lat - self._prev_accel_lat) / dt
+        jerk_long = (accel_long - self._prev_accel_long) * inv_dt
+        jerk_lat = (accel_lat - self._prev_accel_lat) * inv_dt
         self._jerks_long.append(jerk_long)
         self._jerks_lat.append(jerk_lat)
 
         # Steering rate
         steer = control.steer
-        steer_rate = (steer - self._prev_steer) / dt
+        steer_rate = (steer - self._prev_steer) * inv_dt
         self._steers.append(steer)
         self._steer_rates.append(steer_rate)
 
         # Lane center offset
-        waypoint = map_obj.get_waypoint(location, project_to_road=True)
-        if waypoint:
-            lane_center = waypoint.transform.location
-            offset = math.sqrt(
-                (location.x - lane_center.x) ** 2 + (location.y - lane_center.y) ** 2
-            )
+        offset = self._lane_center_offset(location, map_obj)
+        if offset is not None:
             self._lane_offsets.append(offset)
 
         # TTC and headway to lead vehicle
-        lead_vehicle, lead_dist = self._find_lead_vehicle(ego_vehicle, world, fwd)
-        if lead_vehicle and lead_dist > 0:
-            lead_vel = lead_vehicle.get_velocity()
-            lead_speed = math.sqrt(lead_vel.x**2 + lead_vel.y**2 + lead_vel.z**2)
+        if (self._total_ticks - 1) % max(self.lead_subsample, 1) == 0:
+            lead_snapshot, lead_dist = self._find_lead_vehicle(ego_vehicle, world, snapshot, location, fwd)
+        else:
+            lead_snapshot, lead_dist = None, 0.0
+        if lead_snapshot is not None and lead_dist > 0:
+            lead_vel = lead_snapshot.get_velocity()
+            lead_speed = math.hypot(lead_vel.x, lead_vel.y, lead_vel.z)
             rel_speed = speed - lead_speed
             if rel_speed > 0.1:
                 ttc = lead_dist / rel_speed
@@ -258,7 +290,7 @@ class MetricsCollector:
         self._prev_accel_long = accel_long
         self._prev_accel_lat = accel_lat
         self._prev_steer = steer
-        self._prev_velocity = velocity
+        self._prev_velocity = (vx, vy, vz)
 
     def record_collision(self) -> None:
         """Record a collision event."""
@@ -293,10 +325,10 @@ class MetricsCollector:
         # Comfort - Jerk RMS
         if self._jerks_long:
             metrics.jerk_rms_longitudinal = self._rms(self._jerks_long)
-            metrics.jerk_max_longitudinal = max(abs(j) for j in self._jerks_long)
+            metrics.jerk_max_longitudinal = max(map(abs, self._jerks_long))
         if self._jerks_lat:
             metrics.jerk_rms_lateral = self._rms(self._jerks_lat)
-            metrics.jerk_max_lateral = max(abs(j) for j in self._jerks_lat)
+            metrics.jerk_max_lateral = max(map(abs, self._jerks_lat))
 
         # Comfort - Acceleration RMS
         if self._accels_long:
@@ -308,11 +340,13 @@ class MetricsCollector:
         if self._steer_rates:
             metrics.steering_rate_rms = self._rms(self._steer_rates)
 
+        speeds = self._speeds
+        n_speeds = len(speeds)
+        speed_sum = sum(speeds)
+
         # Predictability - Speed oscillation
-        if len(self._speeds) > 2:
-            speed_diffs = [
-                self._speeds[i + 1] - self._speeds[i] for i in range(len(self._speeds) - 1)
-            ]
+        if n_speeds > 2:
+            speed_diffs = array("d", map(sub, speeds[1:], speeds[:-1]))
             metrics.speed_oscillation_score = self._rms(speed_diffs)
 
         # Predictability - Lane center oscillation
@@ -325,31 +359,32 @@ class MetricsCollector:
             metrics.action_smoothness = 1.0 / (1.0 + steer_var)
 
         # Efficiency
-        if self._speeds:
-            metrics.average_speed = sum(self._speeds) / len(self._speeds)
+        if n_speeds:
+            metrics.average_speed = speed_sum / n_speeds
 
         if self._start_location and self._end_location:
             total_dist = self._start_location.distance(self._end_location)
-            path_length = sum(self._speeds) / max(1, self.fps)
+            path_length = speed_sum / max(1, self.fps)
             if path_length > 0:
                 metrics.progress_ratio = min(1.0, total_dist / path_length)
 
         return metrics
 
     @staticmethod
-    def _rms(values: List[float]) -> float:
+    def _rms(values: Sequence[float]) -> float:
         """Compute root mean square."""
         if not values:
             return 0.0
-        return math.sqrt(sum(v * v for v in values) / len(values))
+        return math.sqrt(sum(map(mul, values, values)) / len(values))
 
     @staticmethod
-    def _variance(values: List[float]) -> float:
+    def _variance(values: Sequence[float]) -> float:
         """Compute variance."""
         if len(values) < 2:
             return 0.0
         mean = sum(values) / len(values)
-        return sum((v - mean) ** 2 for v in values) / len(values)
+        deviations = [v - mean for v in values]
+        return sum(map(mul, deviations, deviations)) / len(values)
 
     @staticmethod
     def _get_right_vector(transform: carla.Transform) -> carla.Vector3D:
@@ -360,43 +395,86 @@ class MetricsCollector:
             yaw = math.radians(transform.rotation.yaw)
             return carla.Vector3D(x=-math.sin(yaw), y=math.cos(yaw), z=0.0)
 
+    def _lane_center_offset(
+        self, location: carla.Location, map_obj: carla.Map
+    ) -> Optional[float]:
+        """Distance from ego to its lane center.
+
+        Projects onto the previous tick's lane-center waypoint while ego is still
+        within _LANE_WAYPOINT_REUSE_M of it along the lane; otherwise queries the
+        map for a new one.
+        """
+        if self._lane_center is not None:
+            cx, cy, fx, fy, half_width = self._lane_center
+            dx = location.x - cx
+            dy = location.y - cy
+            if abs(dx * fx + dy * fy) < _LANE_WAYPOINT_REUSE_M:
+                lateral = abs(dy * fx - dx * fy)
+                if lateral <= half_width:
+                    return lateral
+
+        waypoint = map_obj.get_waypoint(location, project_to_road=True)
+        if not waypoint:
+            self._lane_center = None
+            return None
+        lane_center = waypoint.transform.location
+        fwd = waypoint.transform.get_forward_vector()
+        norm = math.hypot(fwd.x, fwd.y)
+        if norm > 1e-6:
+            self._lane_center = (
+                lane_center.x, lane_center.y, fwd.x / norm, fwd.y / norm, 0.5 * waypoint.lane_width
+            )
+        else:
+            self._lane_center = None
+        return math.hypot(location.x - lane_center.x, location.y - lane_center.y)
+
     def _find_lead_vehicle(
         self,
         ego: carla.Vehicle,
         world: carla.World,
+        snapshot: carla.WorldSnapshot,
+        ego_loc: carla.Location,
         fwd: carla.Vector3D,
         max_dist: float = 50.0,
-    ) -> tuple[Optional[carla.Actor], float]:
-        """Find the lead vehicle in front of ego."""
-        ego_loc = ego.get_location()
-        vehicles = world.get_actors().filter("vehicle.*")
+    ) -> tuple[Optional[carla.ActorSnapshot], float]:
+        """Find the lead vehicle in front of ego (returned as its snapshot)."""
+        actor_ids = frozenset(actor_snapshot.id for actor_snapshot in snapshot)
+        if (
+            self._vehicle_cache_tick < 0
+            or self._total_ticks - self._vehicle_cache_tick >= _VEHICLE_REFRESH_TICKS
+            or actor_ids != self._vehicle_cache_actor_ids
+        ):
+            ego_id = ego.id
+            self._vehicle_cache = [
+                v for v in world.get_actors().filter("vehicle.*") if v.id != ego_id
+            ]
+            self._vehicle_cache_tick = self._total_ticks
+            self._vehicle_cache_actor_ids = actor_ids
 
+        # Positions come from the last world tick's snapshot (no per-actor query)
         closest = None
-        min_dist = max_dist
-
-        for v in vehicles:
-            if v.id == ego.id:
+        min_dist_sq = max_dist * max_dist
+
+        for v in self._vehicle_cache:
+            v_snapshot = snapshot.find(v.id)
+            if v_snapshot is None:
+                continue  # Destroyed since the last refresh
+            v_loc = v_snapshot.get_transform().location
+            dx = v_loc.x - ego_loc.x
+            dy = v_loc.y - ego_loc.y
+            dist_sq = dx * dx + dy * dy
+            if dist_sq < 1.0 or dist_sq >= min_dist_sq:
                 continue
-            v_loc = v.get_location()
-            to_v = carla.Vector3D(
-                v_loc.x - ego_loc.x,
-                v_loc.y - ego_loc.y,
-                0.0,
-            )
-            dist = math.sqrt(to_v.x**2 + to_v.y**2)
-            if dist < 1.0 or dist >= min_dist:
-                continue
-
-            # Normalize
-            to_v.x /= dist
-            to_v.y /= dist
 
-            # Check if in front
-            dot = fwd.x * to_v.x + fwd.y * to_v.y
-            if dot < 0.7:  # Within ~45 degrees of forward
+            # Check if in front: cos(angle) >= 0.7 (within ~45 degrees of forward),
+            # tested as dot^2 >= 0.49 * dist^2 so rejected vehicles need no sqrt
+            dot = fwd.x * dx + fwd.y * dy
+            if dot <= 0.0 or dot * dot < 0.49 * dist_sq:
                 continue
 
-            min_dist = dist
-            closest = v
+            min_dist_sq = dist_sq
+            closest = v_snapshot
 
-        return closest, min_dist
+        if closest is None:
+            return None, max_dist
+        return closest, math.sqrt(min_dist_sq)
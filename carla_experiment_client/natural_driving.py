@@ -98,35 +98,29 @@ def apply_natural_driving_config(
     if config is None:
         config = DRIVING_PRESETS.get(preset, DRIVING_PRESETS["normal"])
 
-    try:
+    # (Traffic Manager method, value, label for warnings)
+    settings = (
         # Speed configuration
-        tm.vehicle_percentage_speed_difference(vehicle, config.speed_delta_percent)
-    except RuntimeError as e:
-        logging.warning("Failed to set speed delta: %s", e)
-
-    try:
+        ("vehicle_percentage_speed_difference", config.speed_delta_percent, "speed delta"),
         # Following distance (maps to headway behavior)
-        tm.distance_to_leading_vehicle(vehicle, config.min_follow_distance_m)
-    except (RuntimeError, AttributeError) as e:
-        logging.warning("Failed to set follow distance: %s", e)
-
-    try:
+        ("distance_to_leading_vehicle", config.min_follow_distance_m, "follow distance"),
         # Lane change behavior
-        tm.auto_lane_change(vehicle, config.auto_lane_change)
-    except (RuntimeError, AttributeError) as e:
-        logging.warning("Failed to set auto lane change: %s", e)
-
-    try:
+        ("auto_lane_change", config.auto_lane_change, "auto lane change"),
         # Traffic light compliance
-        tm.ignore_lights_percentage(vehicle, config.ignore_lights_percent)
-    except (RuntimeError, AttributeError) as e:
-        logging.warning("Failed to set ignore lights: %s", e)
-
-    try:
+        ("ignore_lights_percentage", config.ignore_lights_percent, "ignore lights"),
         # Intersection safety
-        tm.ignore_vehicles_percentage(vehicle, config.ignore_vehicles_percent)
-    except (RuntimeError, AttributeError) as e:
-        logging.warning("Failed to set ignore vehicles: %s", e)
+        ("ignore_vehicles_percentage", config.ignore_vehicles_percent, "ignore vehicles"),
+    )
+    for method_name, value, label in settings:
+        # Older CARLA releases lack some of these; skip instead of raising
+        method = getattr(tm, method_name, None)
+        if method is None:
+            logging.warning("Failed to set %s: TrafficManager has no %s()", label, method_name)
+            continue
+        try:
+            method(vehicle, value)
+        except RuntimeError as e:
+            logging.warning("Failed to set %s: %s", label, e)
 
     logging.info(
         "Applied natural driving config (preset=%s) to vehicle %d: "
@@ -196,6 +190,18 @@ class SmoothController:
     _prev_brake: float = 0.0
     _prev_steer: float = 0.0
 
+    # Output control reused across calls, and (1 - alpha) per channel
+    _out: carla.VehicleControl = field(init=False, repr=False)
+    _throttle_keep: float = field(init=False, repr=False)
+    _brake_keep: float = field(init=False, repr=False)
+    _steer_keep: float = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._out = carla.VehicleControl()
+        self._throttle_keep = 1 - self.throttle_alpha
+        self._brake_keep = 1 - self.brake_alpha
+        self._steer_keep = 1 - self.steer_alpha
+
     def smooth(self, control: carla.VehicleControl) -> carla.VehicleControl:
         """Apply smoothing to control input.
 
@@ -203,20 +209,21 @@ class SmoothController:
             control: Raw vehicle control
 
         Returns:
-            Smoothed vehicle control
+            Smoothed vehicle control. The same instance is updated and returned
+            on every call, so apply it before the next call rather than keeping it.
         """
         # Exponential moving average smoothing
         smooth_throttle = (
             self.throttle_alpha * control.throttle
-            + (1 - self.throttle_alpha) * self._prev_throttle
+            + self._throttle_keep * self._prev_throttle
         )
         smooth_brake = (
             self.brake_alpha * control.brake
-            + (1 - self.brake_alpha) * self._prev_brake
+            + self._brake_keep * self._prev_brake
         )
         smooth_steer = (
             self.steer_alpha * control.steer
-            + (1 - self.steer_alpha) * self._prev_steer
+            + self._steer_keep * self._prev_steer
         )
 
         # Update state
@@ -224,16 +231,15 @@ class SmoothController:
         self._prev_brake = smooth_brake
         self._prev_steer = smooth_steer
 
-        # Create smoothed control
-        smoothed = carla.VehicleControl(
-            throttle=smooth_throttle,
-            brake=smooth_brake,
-            steer=smooth_steer,
-            hand_brake=control.hand_brake,
-            reverse=control.reverse,
-            manual_gear_shift=control.manual_gear_shift,
-            gear=control.gear,
-        )
+        # Fill the reused smoothed control
+        smoothed = self._out
+        smoothed.throttle = smooth_throttle
+        smoothed.brake = smooth_brake
+        smoothed.steer = smooth_steer
+        smoothed.hand_brake = control.hand_brake
+        smoothed.reverse = control.reverse
+        smoothed.manual_gear_shift = control.manual_gear_shift
+        smoothed.gear = control.gear
         return smoothed
 
     def reset(self) -> None:
@@ -274,11 +280,9 @@ def create_comfort_brake_profile(
 
     # Map to brake value (assuming linear relationship)
     # Typical vehicle: 1.0 brake ≈ 8-10 m/s² deceleration
-    brake_value = required_decel / 8.0
-
-    # Clamp to comfortable range
-    comfort_brake_max = max_decel / 8.0
-    brake_value = min(brake_value, comfort_brake_max)
-    brake_value = max(0.0, min(1.0, brake_value))
+    inv_full_brake_decel = 0.125  # 1 / 8 m/s²
+    brake_value = required_decel * inv_full_brake_decel
 
-    return brake_value
+    # Clamp to comfortable range, then to [0, 1]
+    comfort_brake_max = max_decel * inv_full_brake_decel
+    return min(1.0, max(0.0, min(brake_value, comfort_brake_max)))
@@ -22,7 +22,7 @@ from .config import (
 from .events.extractor import EventExtractor
 from .scenarios.registry import build_scenario, get_scenario_config_path, get_scenario_ids
 from .sensors.camera_recorder import record_video
-from .telemetry import TelemetryRecorder
+from .telemetry import TelemetryConfig, TelemetryRecorder
 from .utils import ensure_dir, utc_timestamp, write_json
 from .video import encode_frames_to_mp4
 from .weather import apply_weather
@@ -125,6 +125,7 @@ def run_scenario(
     allow_version_mismatch: bool,
     render_preset: str | None = None,
     render_presets_path: Path | None = None,
+    pretty_json: bool = False,
 ) -> int:
     config = load_scenario_config(scenario_path)
     if render_preset:
@@ -179,6 +180,7 @@ def run_scenario(
             world=ctx.world,
             ego_vehicle=scenario_ctx.ego_vehicle,
             fps=config.fps,
+            config=TelemetryConfig(pretty_json=pretty_json),
             tracked_actors=scenario_ctx.actors,
         )
         logging.info("Telemetry recording enabled (SAE J1100 coordinate system)")
@@ -279,6 +281,11 @@ def main() -> int:
         default=None,
         help="Allow client/server version mismatch",
     )
+    parser.add_argument(
+        "--pretty",
+        action="store_true",
+        help="Write telemetry.json indented (default: compact)",
+    )
     args = parser.parse_args()
 
     logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
@@ -308,6 +315,7 @@ def main() -> int:
         allow_version_mismatch=client_config.allow_version_mismatch,
         render_preset=args.render_preset,
         render_presets_path=args.render_presets if args.render_preset else None,
+        pretty_json=args.pretty,
     )
 
 
@@ -56,8 +56,9 @@ class RedLightConflictScenario(BaseScenario):
                 except RuntimeError:
                     continue
                 for wp in other_wps:
-                    if wp.transform.location.distance(stop_loc) <= radius_m:
-                        candidates.append(wp.transform)
+                    wp_transform = wp.transform
+                    if wp_transform.location.distance(stop_loc) <= radius_m:
+                        candidates.append(wp_transform)
                         break
             if candidates:
                 return rng.choice(candidates)
@@ -71,8 +72,9 @@ class RedLightConflictScenario(BaseScenario):
             radius_m: float = 45.0,
             min_yaw_diff: float = 60.0,
         ) -> carla.Transform | None:
-            stop_loc = stop_wp.transform.location
-            ego_yaw = stop_wp.transform.rotation.yaw
+            stop_transform = stop_wp.transform
+            stop_loc = stop_transform.location
+            ego_yaw = stop_transform.rotation.yaw
             candidates: list[carla.Transform] = []
             for sp in spawn_points:
                 if sp.location.distance(stop_loc) > radius_m:
@@ -82,12 +84,13 @@ class RedLightConflictScenario(BaseScenario):
                 )
                 if wp is None:
                     continue
-                if abs(wp.transform.location.z - stop_loc.z) > 2.0:
+                wp_transform = wp.transform
+                if abs(wp_transform.location.z - stop_loc.z) > 2.0:
                     continue
-                yaw_diff = abs(_normalize_yaw(wp.transform.rotation.yaw - ego_yaw))
+                yaw_diff = abs(_normalize_yaw(wp_transform.rotation.yaw - ego_yaw))
                 if yaw_diff < min_yaw_diff or yaw_diff > 160.0:
                     continue
-                candidates.append(wp.transform)
+                candidates.append(wp_transform)
             if candidates:
                 return rng.choice(candidates)
             return None
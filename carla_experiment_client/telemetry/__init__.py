@@ -9,7 +9,7 @@ system transformations for vehicle state data including:
 - Vehicle control inputs (throttle, brake, steer)
 """
 
-from .recorder import TelemetryRecorder
+from .recorder import TelemetryConfig, TelemetryRecorder
 from .sae_j670 import SAEJ670Transformer
 
-__all__ = ["TelemetryRecorder", "SAEJ670Transformer"]
+__all__ = ["TelemetryConfig", "TelemetryRecorder", "SAEJ670Transformer"]
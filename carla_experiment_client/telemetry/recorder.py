@@ -25,6 +25,11 @@ try:
 except ImportError:
     carla = None
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 @dataclass
 class TelemetryConfig:
@@ -35,9 +40,10 @@ class TelemetryConfig:
     output_csv: bool = True
     include_actors: bool = True
     actor_radius_m: float = 50.0  # Only record actors within this radius
+    pretty_json: bool = False  # Indent telemetry.json (compact by default)
 
 
-@dataclass
+@dataclass(slots=True)
 class TelemetryFrame:
     """Single frame of telemetry data."""
 
@@ -294,8 +300,15 @@ class TelemetryRecorder:
             },
             "frames": [f.to_dict() for f in self._frames],
         }
+        pretty = self.config.pretty_json
+        if orjson is not None:
+            path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0))
+            return
         with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+            if pretty:
+                json.dump(data, f, indent=2)
+            else:
+                json.dump(data, f, separators=(",", ":"))
 
     def _save_csv(self, path: Path) -> None:
         """Save ego vehicle telemetry as CSV."""
@@ -21,6 +21,7 @@ Therefore: SAE_Y = -CARLA_Y
 from __future__ import annotations
 
 import math
+from collections import deque
 from dataclasses import dataclass, field
 from typing import Any, Dict, Optional
 
@@ -30,7 +31,7 @@ except ImportError:
     carla = None  # Allow module to be imported without CARLA
 
 
-@dataclass
+@dataclass(slots=True)
 class VehicleState:
     """Vehicle state in SAE J670 coordinate system."""
 
@@ -173,15 +174,15 @@ class SAEJ670Transformer:
         self._prev_rotation: Optional[Any] = None  # carla.Rotation
         self._prev_transform: Optional[Any] = None  # carla.Transform
         # Smoothing history for acceleration (reduces noise)
-        self._accel_history: list = []
         self._accel_history_len = 3  # Moving average window
+        self._accel_history: deque = deque(maxlen=self._accel_history_len)
 
     def reset(self) -> None:
         """Reset state for new recording."""
         self._prev_velocity = None
         self._prev_rotation = None
         self._prev_transform = None
-        self._accel_history = []
+        self._accel_history.clear()
 
     def _clamp(self, value: float, limit: float) -> float:
         """Clamp value to [-limit, limit] range."""
@@ -190,8 +191,6 @@ class SAEJ670Transformer:
     def _smooth_accel(self, ax: float, ay: float, az: float) -> tuple:
         """Apply moving average smoothing to acceleration."""
         self._accel_history.append((ax, ay, az))
-        if len(self._accel_history) > self._accel_history_len:
-            self._accel_history.pop(0)
 
         if len(self._accel_history) == 0:
             return ax, ay, az
@@ -20,7 +20,7 @@ def ensure_dir(path: Path) -> None:
 
 
 def write_json(path: Path, payload: Any) -> None:
-    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2))
+    path.write_bytes(json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8"))
 
 
 def run_command(args: Sequence[str], *, cwd: Path | None = None) -> None:
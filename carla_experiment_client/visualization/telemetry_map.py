@@ -22,116 +22,121 @@ import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.patches import FancyArrowPatch
 from matplotlib.collections import LineCollection
-from matplotlib.colors import Normalize
+from matplotlib.colors import Normalize, to_rgba
 import matplotlib.cm as cm
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _load_json(path: str):
+    """Parse a JSON file, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(Path(path).read_bytes())
+    with open(path, 'r') as f:
+        return json.load(f)
+
 
 def load_telemetry(telemetry_path: str) -> dict:
     """Load telemetry JSON file."""
-    with open(telemetry_path, 'r') as f:
-        return json.load(f)
+    return _load_json(telemetry_path)
 
 
 def load_events(events_path: str) -> List[dict]:
     """Load events JSON file."""
-    with open(events_path, 'r') as f:
-        data = json.load(f)
-        return data.get('events', [])
+    return _load_json(events_path).get('events', [])
 
 
 def extract_ego_trajectory(telemetry: dict) -> dict:
     """Extract ego vehicle trajectory data."""
     frames = telemetry['frames']
 
-    data = {
-        't': [],
-        'x': [],
-        'y': [],
-        'yaw': [],
-        'speed': [],
-        'vx': [],
-        'vy': [],
-        'ax': [],
-        'ay': [],
-        'throttle': [],
-        'brake': [],
-        'steer': []
-    }
+    keys = ('t', 'x', 'y', 'yaw', 'speed', 'vx', 'vy', 'ax', 'ay',
+            'throttle', 'brake', 'steer')
 
+    # One row per frame, converted to a (frames, channels) array in a single
+    # NumPy call instead of appending to a list per channel.
+    rows = []
     for frame in frames:
         ego = frame['ego']
-        data['t'].append(frame['t_sim'])
-        data['x'].append(ego['position']['x'])
-        data['y'].append(ego['position']['y'])
-        data['yaw'].append(ego['orientation']['yaw'])
-        data['speed'].append(ego['speed'])
-        data['vx'].append(ego['velocity']['vx'])
-        data['vy'].append(ego['velocity']['vy'])
-        data['ax'].append(ego['acceleration']['ax'])
-        data['ay'].append(ego['acceleration']['ay'])
-        data['throttle'].append(ego['control']['throttle'])
-        data['brake'].append(ego['control']['brake'])
-        data['steer'].append(ego['control']['steer'])
-
-    return {k: np.array(v) for k, v in data.items()}
+        rows.append((
+            frame['t_sim'],
+            ego['position']['x'],
+            ego['position']['y'],
+            ego['orientation']['yaw'],
+            ego['speed'],
+            ego['velocity']['vx'],
+            ego['velocity']['vy'],
+            ego['acceleration']['ax'],
+            ego['acceleration']['ay'],
+            ego['control']['throttle'],
+            ego['control']['brake'],
+            ego['control']['steer'],
+        ))
+    # Transposed copy so each channel is a contiguous row
+    columns = np.array(rows, dtype=float).reshape(-1, len(keys)).T.copy()
+
+    return dict(zip(keys, columns))
 
 
 def extract_actor_trajectories(telemetry: dict) -> Dict[int, dict]:
     """Extract trajectories for all actors."""
     actors_data = {}
+    samples: Dict[int, List[tuple]] = {}
+    keys = ('t', 'x', 'y', 'distance', 'speed')
 
     for frame in telemetry['frames']:
         t = frame['t_sim']
         for actor in frame.get('actors', []):
             actor_id = actor['id']
-            if actor_id not in actors_data:
+            rows = samples.get(actor_id)
+            if rows is None:
+                rows = samples[actor_id] = []
                 actors_data[actor_id] = {
                     'id': actor_id,
                     'type': actor['type'],
                     'type_id': actor.get('type_id', ''),
                     'role_name': actor.get('role_name', ''),
-                    't': [],
-                    'x': [],
-                    'y': [],
-                    'distance': [],
-                    'speed': [],
                     'first_seen_t': t,
                     'first_seen_distance': actor.get('distance_to_ego', 0)
                 }
 
-            actors_data[actor_id]['t'].append(t)
-            actors_data[actor_id]['x'].append(actor['position']['x'])
-            actors_data[actor_id]['y'].append(actor['position']['y'])
-            actors_data[actor_id]['distance'].append(actor.get('distance_to_ego', 0))
-            actors_data[actor_id]['speed'].append(actor.get('speed', 0))
+            position = actor['position']
+            rows.append((t, position['x'], position['y'],
+                         actor.get('distance_to_ego', 0), actor.get('speed', 0)))
 
-    # Convert to numpy arrays
-    for actor_id in actors_data:
-        for key in ['t', 'x', 'y', 'distance', 'speed']:
-            actors_data[actor_id][key] = np.array(actors_data[actor_id][key])
+    # Convert each actor's samples to per-channel numpy arrays in one call
+    for actor_id, rows in samples.items():
+        columns = np.array(rows).reshape(-1, len(keys)).T.copy()
+        actors_data[actor_id].update(zip(keys, columns))
 
     return actors_data
 
 
 def find_event_positions(ego_data: dict, events: List[dict]) -> List[dict]:
     """Map events to ego positions."""
-    event_positions = []
-
-    for event in events:
-        t_event = event['t_event']
-        # Find closest time index
-        idx = np.argmin(np.abs(ego_data['t'] - t_event))
-
-        event_positions.append({
-            't': t_event,
-            'x': ego_data['x'][idx],
-            'y': ego_data['y'][idx],
+    if not events:
+        return []
+
+    t_events = np.fromiter((event['t_event'] for event in events), dtype=float, count=len(events))
+    # Closest time index for every event at once (argmin keeps the first match on ties)
+    idx = np.argmin(np.abs(ego_data['t'][np.newaxis, :] - t_events[:, np.newaxis]), axis=1)
+    xs = ego_data['x'][idx]
+    ys = ego_data['y'][idx]
+
+    return [
+        {
+            't': event['t_event'],
+            'x': x,
+            'y': y,
             'type': event['type'],
             'decision_text': event.get('decision_text', ''),
             'reason_text': event.get('reason_text', '')
-        })
-
-    return event_positions
+        }
+        for event, x, y in zip(events, xs, ys)
+    ]
 
 
 def plot_trajectory_2d(
@@ -140,7 +145,8 @@ def plot_trajectory_2d(
     events: List[dict],
     scenario_name: str,
     output_path: str,
-    color_by: str = 'speed'
+    color_by: str = 'speed',
+    dpi: int = 150
 ) -> None:
     """
     Plot 2D trajectory map with ego, actors, and events.
@@ -152,6 +158,7 @@ def plot_trajectory_2d(
         scenario_name: Name of scenario
         output_path: Path to save figure
         color_by: 'speed' or 'acceleration' for trajectory coloring
+        dpi: Output resolution passed to savefig
     """
     fig, axes = plt.subplots(2, 2, figsize=(16, 14))
     fig.suptitle(f'Telemetry Analysis: {scenario_name}', fontsize=14, fontweight='bold')
@@ -178,7 +185,7 @@ def plot_trajectory_2d(
     segments = np.concatenate([points[:-1], points[1:]], axis=1)
 
     norm = Normalize(vmin=colors.min(), vmax=colors.max())
-    lc = LineCollection(segments, cmap=cmap, norm=norm, linewidth=3, alpha=0.8)
+    lc = LineCollection(segments, cmap=cmap, norm=norm, linewidth=3, alpha=0.8, rasterized=True)
     lc.set_array(colors[:-1])
     ax1.add_collection(lc)
 
@@ -198,6 +205,8 @@ def plot_trajectory_2d(
     }
 
     plotted_roles = set()
+    background_segments = []
+    start_x, start_y, start_colors = [], [], []
     for actor_id, actor in actors_data.items():
         role = actor['role_name']
         type_id = actor['type_id']
@@ -226,17 +235,31 @@ def plot_trajectory_2d(
             alpha = 0.9
             linewidth = 2.5
 
+        # Mark where actor first appeared (drawn as one scatter below)
+        if len(actor['x']) > 0:
+            start_x.append(actor['x'][0])
+            start_y.append(actor['y'][0])
+            start_colors.append(to_rgba(color, alpha))
+
+        # Background traffic is never labeled; batch it into one collection
+        if color == 'gray':
+            if len(actor['x']) > 1:
+                background_segments.append(np.column_stack([actor['x'], actor['y']]))
+            continue
+
         # Create label for legend (only once per role)
         actor_label = None
-        if role and role not in plotted_roles and color != 'gray':
+        if role and role not in plotted_roles:
             actor_label = role
             plotted_roles.add(role)
 
         ax1.plot(actor['x'], actor['y'], c=color, alpha=alpha, linewidth=linewidth, label=actor_label)
 
-        # Mark where actor first appeared
-        if len(actor['x']) > 0:
-            ax1.scatter(actor['x'][0], actor['y'][0], c=color, s=50, marker='^', alpha=alpha)
+    if background_segments:
+        ax1.add_collection(LineCollection(background_segments, colors='gray', linewidths=1,
+                                          alpha=0.3, rasterized=True))
+    if start_colors:
+        ax1.scatter(start_x, start_y, c=start_colors, s=50, marker='^')
 
     # Plot events on trajectory
     event_positions = find_event_positions(ego_data, events)
@@ -252,10 +275,13 @@ def plot_trajectory_2d(
         'lane_change_right': 'lightgreen'
     }
 
+    if event_positions:
+        ax1.scatter(np.asarray([ep['x'] for ep in event_positions]),
+                    np.asarray([ep['y'] for ep in event_positions]),
+                    c=[event_colors.get(ep['type'], 'black') for ep in event_positions],
+                    s=200, marker='*', edgecolors='black', linewidth=1, zorder=15)
     for ep in event_positions:
         color = event_colors.get(ep['type'], 'black')
-        ax1.scatter(ep['x'], ep['y'], c=color, s=200, marker='*',
-                   edgecolors='black', linewidth=1, zorder=15)
         ax1.annotate(f"{ep['type']}\n({ep['t']:.1f}s)",
                     (ep['x'], ep['y']),
                     textcoords="offset points", xytext=(10, 10),
@@ -407,7 +433,7 @@ def plot_trajectory_2d(
                    linestyle='--', alpha=0.5)
 
     plt.tight_layout()
-    plt.savefig(output_path, dpi=150, bbox_inches='tight')
+    plt.savefig(output_path, dpi=dpi, bbox_inches='tight')
     plt.close()
 
     print(f"Saved: {output_path}")
@@ -416,7 +442,8 @@ def plot_trajectory_2d(
 def plot_actor_appearance_analysis(
     actors_data: Dict[int, dict],
     scenario_name: str,
-    output_path: str
+    output_path: str,
+    dpi: int = 150
 ) -> None:
     """
     Analyze when actors first appear and at what distance.
@@ -476,7 +503,7 @@ def plot_actor_appearance_analysis(
     ax.grid(True, alpha=0.3)
 
     plt.tight_layout()
-    plt.savefig(output_path, dpi=150, bbox_inches='tight')
+    plt.savefig(output_path, dpi=dpi, bbox_inches='tight')
     plt.close()
 
     print(f"Saved: {output_path}")
@@ -486,7 +513,8 @@ def generate_scenario_report(
     telemetry_path: str,
     events_path: str,
     output_dir: str,
-    scenario_name: str
+    scenario_name: str,
+    dpi: int = 150
 ) -> dict:
     """
     Generate complete visualization report for a scenario.
@@ -507,20 +535,23 @@ def generate_scenario_report(
     plot_trajectory_2d(
         ego_data, actors_data, events, scenario_name,
         os.path.join(output_dir, f'{scenario_name}_trajectory.png'),
-        color_by='speed'
+        color_by='speed',
+        dpi=dpi
     )
 
     # Generate acceleration-colored version
     plot_trajectory_2d(
         ego_data, actors_data, events, scenario_name,
         os.path.join(output_dir, f'{scenario_name}_trajectory_accel.png'),
-        color_by='acceleration'
+        color_by='acceleration',
+        dpi=dpi
     )
 
     # Generate actor appearance analysis
     plot_actor_appearance_analysis(
         actors_data, scenario_name,
-        os.path.join(output_dir, f'{scenario_name}_appearance.png')
+        os.path.join(output_dir, f'{scenario_name}_appearance.png'),
+        dpi=dpi
     )
 
     # Calculate summary statistics
@@ -572,7 +603,7 @@ def generate_scenario_report(
     return summary
 
 
-def analyze_all_scenarios(runs_dir: str, output_dir: str) -> None:
+def analyze_all_scenarios(runs_dir: str, output_dir: str, dpi: int = 150) -> None:
     """
     Analyze all scenarios in a runs directory.
     """
@@ -601,7 +632,8 @@ def analyze_all_scenarios(runs_dir: str, output_dir: str) -> None:
                     str(telemetry_file),
                     str(events_file),
                     str(output_path / scenario_name),
-                    scenario_name
+                    scenario_name,
+                    dpi=dpi
                 )
                 all_summaries.append(summary)
             except Exception as e:
@@ -627,10 +659,14 @@ def analyze_all_scenarios(runs_dir: str, output_dir: str) -> None:
 if __name__ == '__main__':
     import argparse
 
+    # The CLI only writes figures to disk; use the non-interactive raster backend
+    plt.switch_backend('Agg')
+
     parser = argparse.ArgumentParser(description='Generate 2D telemetry visualizations')
     parser.add_argument('--runs', type=str, required=True, help='Path to runs directory')
     parser.add_argument('--output', type=str, default='./telemetry_analysis', help='Output directory')
     parser.add_argument('--scenario', type=str, default=None, help='Analyze specific scenario only')
+    parser.add_argument('--dpi', type=int, default=150, help='Output image resolution')
 
     args = parser.parse_args()
 
@@ -647,8 +683,9 @@ if __name__ == '__main__':
             str(scenario_dir / 'telemetry.json'),
             str(scenario_dir / 'events.json'),
             args.output,
-            args.scenario
+            args.scenario,
+            dpi=args.dpi
         )
     else:
         # Analyze all scenarios
-        analyze_all_scenarios(args.runs, args.output)
+        analyze_all_scenarios(args.runs, args.output, dpi=args.dpi)